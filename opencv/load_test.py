@@ -0,0 +1,347 @@
+"""
+Load generator for the ArUco marker detection API
+
+Drives the FastAPI app either in-process (ASGI transport, no server needed) or
+against a running server (e.g. local uvicorn / App Runner URL) and reports
+throughput, latency percentiles, error and shed rates.
+
+In-process mode shares one event loop between the generator and the app, and the
+endpoints run OpenCV detection synchronously on that loop. Concurrency and arrival
+timing are therefore distorted and the numbers only roughly match a single uvicorn
+worker without HTTP overhead. Use --url against a real server for sizing runs.
+
+Requires httpx (listed in requirements.txt).
+
+Examples:
+    python load_test.py --requests 200 --concurrency 8
+    python load_test.py --url http://localhost:8000 --rate 20 --duration 30
+    python load_test.py --image markers_0_to_5.png:3 --image other.jpg:1 --endpoint /detect-markers-stream
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import httpx
+
+# Status codes treated as load shedding rather than errors
+SHED_STATUS_CODES = {429, 503}
+
+CONTENT_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".bmp": "image/bmp",
+    ".tiff": "image/tiff",
+    ".webp": "image/webp",
+}
+
+
+@dataclass
+class RequestResult:
+    """Outcome of a single request"""
+    latency: float
+    status_code: Optional[int]
+    image: str
+    reused: Optional[bool] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class LoadTestConfig:
+    """Load test settings"""
+    endpoint: str = "/detect-markers"
+    url: Optional[str] = None
+    concurrency: int = 4
+    rate: Optional[float] = None
+    total_requests: Optional[int] = 100
+    duration: Optional[float] = None
+    sessions: int = 1
+    timeout: float = 30.0
+    images: List[Tuple[str, float]] = field(default_factory=list)
+
+
+def parse_image_spec(spec: str) -> Tuple[str, float]:
+    """
+    Parse an image mix entry
+
+    Args:
+        spec: "path" or "path:weight"
+
+    Returns:
+        Tuple of (path, weight)
+
+    Raises:
+        ValueError: If the weight is not a positive finite number
+    """
+    path, sep, weight = spec.rpartition(":")
+    if not sep or not path:
+        return spec, 1.0
+
+    try:
+        value = float(weight)
+    except ValueError:
+        # No numeric weight suffix; treat the whole spec as a path
+        return spec, 1.0
+
+    if not math.isfinite(value) or value <= 0:
+        raise ValueError(f"Image weight must be a positive number: {spec}")
+    return path, value
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Calculate a percentile using linear interpolation
+
+    Args:
+        values: Sorted list of values
+        pct: Percentile between 0 and 100
+
+    Returns:
+        Percentile value (0.0 if values is empty)
+    """
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (k - lower)
+
+
+class LoadGenerator:
+    """Sends image upload requests with a configurable concurrency, image mix and arrival rate"""
+
+    def __init__(self, config: LoadTestConfig):
+        """
+        Initialize the load generator and read all images into memory
+
+        Args:
+            config: Load test settings
+        """
+        self.config = config
+        self.images: List[Tuple[str, bytes, str]] = []
+        self.weights: List[float] = []
+        for path, weight in config.images:
+            suffix = Path(path).suffix.lower()
+            self.images.append((Path(path).name, Path(path).read_bytes(), CONTENT_TYPES.get(suffix, "image/png")))
+            self.weights.append(weight)
+        self.results: List[RequestResult] = []
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """Create an HTTP client for either a remote server or the in-process app"""
+        limits = httpx.Limits(max_connections=self.config.concurrency)
+        if self.config.url:
+            return httpx.AsyncClient(base_url=self.config.url, timeout=self.config.timeout, limits=limits)
+
+        from main import app
+        transport = httpx.ASGITransport(app=app)
+        return httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=self.config.timeout)
+
+    async def _send(self, client: httpx.AsyncClient, request_index: int, scheduled_at: float) -> None:
+        """
+        Send one request and record its result
+
+        Latency is measured from the scheduled arrival time so that client-side
+        queueing under open-loop load is included.
+        """
+        name, content, content_type = random.choices(self.images, weights=self.weights)[0]
+        files = {"file": (name, content, content_type)}
+        data = {"session_id": f"loadtest-{request_index % self.config.sessions}"}
+
+        try:
+            response = await client.post(self.config.endpoint, files=files, data=data)
+            latency = time.perf_counter() - scheduled_at
+            reused = None
+            if response.status_code == 200 and response.headers.get("content-type", "").startswith("application/json"):
+                reused = response.json().get("reused")
+            self.results.append(RequestResult(latency, response.status_code, name, reused=reused))
+        except Exception as e:
+            latency = time.perf_counter() - scheduled_at
+            self.results.append(RequestResult(latency, None, name, error=f"{type(e).__name__}: {e}"))
+
+    def _should_continue(self, sent: int, start: float) -> bool:
+        """Check the request count and duration limits"""
+        if self.config.total_requests is not None and sent >= self.config.total_requests:
+            return False
+        if self.config.duration is not None and time.perf_counter() - start >= self.config.duration:
+            return False
+        return True
+
+    async def _run_closed_loop(self, client: httpx.AsyncClient, start: float) -> None:
+        """Each worker sends its next request as soon as the previous one completes"""
+        sent = 0
+
+        async def worker() -> None:
+            nonlocal sent
+            while self._should_continue(sent, start):
+                request_index = sent
+                sent += 1
+                await self._send(client, request_index, time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(self.config.concurrency)))
+
+    async def _run_open_loop(self, client: httpx.AsyncClient, start: float) -> None:
+        """Requests arrive as a Poisson process; at most `concurrency` are in flight"""
+        semaphore = asyncio.Semaphore(self.config.concurrency)
+        tasks = []
+        sent = 0
+        next_arrival = start
+
+        async def limited_send(request_index: int, scheduled_at: float) -> None:
+            async with semaphore:
+                await self._send(client, request_index, scheduled_at)
+
+        while self._should_continue(sent, start):
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(limited_send(sent, next_arrival)))
+            sent += 1
+            next_arrival += random.expovariate(self.config.rate)
+
+        await asyncio.gather(*tasks)
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Run the load test
+
+        Returns:
+            Summary report
+        """
+        self.results = []
+        async with self._create_client() as client:
+            start = time.perf_counter()
+            if self.config.rate is not None:
+                await self._run_open_loop(client, start)
+            else:
+                await self._run_closed_loop(client, start)
+            elapsed = time.perf_counter() - start
+
+        return self.summarize(elapsed)
+
+    def summarize(self, elapsed: float) -> Dict[str, Any]:
+        """
+        Build the summary report from the collected results
+
+        Args:
+            elapsed: Wall-clock duration of the test in seconds
+
+        Returns:
+            Dictionary with throughput, latency percentiles and error/shed rates
+        """
+        total = len(self.results)
+        succeeded = [r for r in self.results if r.status_code is not None and 200 <= r.status_code < 300]
+        shed = [r for r in self.results if r.status_code in SHED_STATUS_CODES]
+        errors = total - len(succeeded) - len(shed)
+        latencies = sorted(r.latency * 1000 for r in succeeded)
+        reused = [r for r in succeeded if r.reused]
+
+        status_counts: Dict[str, int] = {}
+        for r in self.results:
+            key = str(r.status_code) if r.status_code is not None else "exception"
+            status_counts[key] = status_counts.get(key, 0) + 1
+
+        return {
+            "target": self.config.url or "in-process",
+            "endpoint": self.config.endpoint,
+            "mode": f"open-loop ({self.config.rate} req/s)" if self.config.rate is not None else "closed-loop",
+            "concurrency": self.config.concurrency,
+            "total_requests": total,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_rps": round(len(succeeded) / elapsed, 2) if elapsed > 0 else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50), 2),
+                "p95": round(percentile(latencies, 95), 2),
+                "p99": round(percentile(latencies, 99), 2),
+                "max": round(latencies[-1], 2) if latencies else 0.0,
+            },
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "shed_rate": round(len(shed) / total, 4) if total else 0.0,
+            "reuse_rate": round(len(reused) / len(succeeded), 4) if succeeded else 0.0,
+            "status_counts": status_counts,
+        }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print a human-readable summary report"""
+    latency = report["latency_ms"]
+    print(f"🎯 Target: {report['target']} {report['endpoint']} [{report['mode']}, concurrency={report['concurrency']}]")
+    print(f"Requests: {report['total_requests']} in {report['elapsed_seconds']}s")
+    print(f"Throughput: {report['throughput_rps']} req/s")
+    print(f"Latency (ms): p50={latency['p50']} p95={latency['p95']} p99={latency['p99']} max={latency['max']}")
+    print(f"Error rate: {report['error_rate']:.2%}  Shed rate: {report['shed_rate']:.2%}  Reuse rate: {report['reuse_rate']:.2%}")
+    print(f"Status codes: {report['status_counts']}")
+
+
+def main():
+    """Parse arguments and run the load test"""
+    parser = argparse.ArgumentParser(description="Load generator for the ArUco marker detection API")
+    parser.add_argument("--url", help="Base URL of a running server (default: drive the app in-process)")
+    parser.add_argument("--endpoint", default="/detect-markers", help="Endpoint to POST images to")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum requests in flight")
+    parser.add_argument("--rate", type=float, help="Poisson arrival rate in req/s (default: closed loop)")
+    parser.add_argument("--requests", type=int, help="Total number of requests (default: 100 unless --duration is set)")
+    parser.add_argument("--duration", type=float, help="Stop sending new requests after this many seconds")
+    parser.add_argument("--sessions", type=int, default=1, help="Number of session ids for /detect-markers-stream")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument(
+        "--image", action="append", dest="images", metavar="PATH[:WEIGHT]",
+        help="Image to include in the mix (repeatable, default: markers_0_to_5.png)"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.sessions < 1:
+        parser.error("--sessions must be at least 1")
+    if args.requests is not None and args.requests < 1:
+        parser.error("--requests must be at least 1")
+    if args.rate is not None and not (math.isfinite(args.rate) and args.rate > 0):
+        parser.error("--rate must be a positive number")
+    if args.duration is not None and not (math.isfinite(args.duration) and args.duration > 0):
+        parser.error("--duration must be a positive number")
+    if not (math.isfinite(args.timeout) and args.timeout > 0):
+        parser.error("--timeout must be a positive number")
+
+    total_requests = args.requests
+    if total_requests is None and args.duration is None:
+        total_requests = 100
+
+    images = []
+    for spec in args.images or ["markers_0_to_5.png"]:
+        try:
+            path, weight = parse_image_spec(spec)
+        except ValueError as e:
+            parser.error(str(e))
+        if not Path(path).is_file():
+            parser.error(f"Image not found: {path}")
+        images.append((path, weight))
+
+    config = LoadTestConfig(
+        endpoint=args.endpoint,
+        url=args.url,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        total_requests=total_requests,
+        duration=args.duration,
+        sessions=args.sessions,
+        timeout=args.timeout,
+        images=images,
+    )
+
+    report = asyncio.run(LoadGenerator(config).run())
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
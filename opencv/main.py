@@ -9,11 +9,11 @@ from typing import Dict, Any
 import cv2
 import numpy as np
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException
 from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from marker_detector import detect_markers, detect_markers_with_annotation
+from marker_detector import detect_markers, detect_markers_gated, detect_markers_with_annotation, frame_gate
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -63,6 +63,8 @@ async def root():
         "endpoints": {
             "/detect-markers": "POST - Upload image and detect ArUco markers",
             "/detect-markers-annotated": "POST - Upload image and get annotated result image",
+            "/detect-markers-stream": "POST - Upload a streaming frame; reuses the last result if the frame is unchanged",
+            "/detect-markers-stream/{session_id}": "DELETE - Reset a streaming session",
             "/health": "GET - Health check"
         }
     }
@@ -114,6 +116,68 @@ async def detect_markers_endpoint(file: UploadFile = File(...)) -> Dict[str, Any
         raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
 
 
+@app.post("/detect-markers-stream")
+async def detect_markers_stream_endpoint(
+    file: UploadFile = File(...),
+    session_id: str = Form(...)
+) -> Dict[str, Any]:
+    """
+    Detect ArUco markers in a streaming frame, skipping detection for unchanged frames
+    
+    Args:
+        file: Uploaded image file
+        session_id: Identifier of the streaming client session
+        
+    Returns:
+        JSON response with detected markers information and whether the result was reused
+    """
+    try:
+        # Validate file
+        await _validate_uploaded_file(file)
+        
+        # Read file content
+        image_bytes = await file.read()
+        
+        # Detect markers (or reuse the previous result)
+        detection_result = detect_markers_gated(image_bytes, session_id)
+        
+        # Add metadata
+        response = {
+            **detection_result,
+            "session_id": session_id,
+            "filename": file.filename,
+            "file_size": len(image_bytes),
+            "content_type": file.content_type
+        }
+        
+        logger.info(
+            f"Stream detection completed for session {session_id}: "
+            f"{detection_result['total_markers']} markers, reused={detection_result['reused']}"
+        )
+        return response
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing stream frame for session {session_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
+
+
+@app.delete("/detect-markers-stream/{session_id}")
+async def reset_stream_session_endpoint(session_id: str) -> Dict[str, Any]:
+    """
+    Reset the cached frame of a streaming session
+    
+    Args:
+        session_id: Identifier of the streaming client session
+        
+    Returns:
+        JSON response indicating whether the session existed
+    """
+    existed = frame_gate.reset(session_id)
+    return {"session_id": session_id, "reset": existed}
+
+
 @app.post("/detect-markers-annotated")
 async def detect_markers_annotated_endpoint(file: UploadFile = File(...)):
     """
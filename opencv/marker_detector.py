@@ -3,6 +3,10 @@ ArUco marker detection module for FastAPI application.
 Uses the same detection logic as generate-marker.py
 """
 
+import os
+import threading
+import time
+from collections import OrderedDict
 import cv2
 import numpy as np
 from cv2 import aruco
@@ -24,6 +28,30 @@ class MarkerDetector:
         self.detector = aruco.ArucoDetector(self.dictionary, self.parameters)
         logger.info("MarkerDetector initialized with DICT_4X4_50")
     
+    @staticmethod
+    def decode_image(image_bytes: bytes) -> np.ndarray:
+        """
+        Decode image bytes into an OpenCV image
+        
+        Args:
+            image_bytes: Image data as bytes
+            
+        Returns:
+            OpenCV image (numpy array)
+            
+        Raises:
+            ValueError: If the image could not be decoded
+        """
+        # Convert bytes to numpy array
+        nparr = np.frombuffer(image_bytes, np.uint8)
+        
+        # Decode image
+        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Could not decode image")
+        
+        return image
+    
     def detect_markers_from_bytes(self, image_bytes: bytes) -> Dict[str, Any]:
         """
         Detect ArUco markers from image bytes
@@ -35,14 +63,7 @@ class MarkerDetector:
             Dictionary containing detection results
         """
         try:
-            # Convert bytes to numpy array
-            nparr = np.frombuffer(image_bytes, np.uint8)
-            
-            # Decode image
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            if image is None:
-                raise ValueError("Could not decode image")
-            
+            image = self.decode_image(image_bytes)
             return self.detect_markers_from_image(image)
             
         except Exception as e:
@@ -178,9 +199,186 @@ class MarkerDetector:
             return image
 
 
+class FrameDifferenceGate:
+    """
+    Per-session gate that skips detection when a frame barely differs from the last processed one
+
+    Each session keeps a downscaled grayscale thumbnail of the last frame that was
+    actually run through the detector, together with its result. Incoming frames are
+    compared against that thumbnail and the cached result is reused while no thumbnail
+    pixel changed by more than the threshold. The largest per-pixel change is used rather
+    than the mean so that a change confined to a small area (e.g. a single card being
+    removed) is not diluted by the unchanged background.
+
+    The thumbnail resolution follows the smallest marker the detector can still read
+    (minMarkerPerimeterRate), so that one marker bit covers at least pixels_per_bit
+    thumbnail pixels and swapping one small marker for another is always visible.
+    """
+    
+    def __init__(
+        self,
+        marker_detector: MarkerDetector,
+        threshold: float = 0.15,
+        pixels_per_bit: float = 1.0,
+        max_sessions: int = 256,
+        max_reuse: int = 30,
+        max_reuse_seconds: float = 1.0
+    ):
+        """
+        Initialize the frame difference gate
+        
+        Args:
+            marker_detector: Detector used when a frame has changed
+            threshold: Largest per-pixel thumbnail difference (0-1) below which results are reused
+            pixels_per_bit: Thumbnail pixels per bit of the smallest detectable marker
+            max_sessions: Maximum number of sessions kept before evicting the oldest
+            max_reuse: Maximum consecutive reuses before a fresh detection is forced
+            max_reuse_seconds: Maximum age of a cached result before a fresh detection is forced
+        """
+        self.detector = marker_detector
+        self.threshold = threshold
+        self.pixels_per_bit = pixels_per_bit
+        self.max_sessions = max_sessions
+        self.max_reuse = max_reuse
+        self.max_reuse_seconds = max_reuse_seconds
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        logger.info(
+            f"FrameDifferenceGate initialized (threshold={threshold}, "
+            f"pixels_per_bit={pixels_per_bit}, max_sessions={max_sessions}, "
+            f"max_reuse={max_reuse}, max_reuse_seconds={max_reuse_seconds})"
+        )
+    
+    def detect_markers_from_image(self, session_id: str, image: np.ndarray) -> Dict[str, Any]:
+        """
+        Detect ArUco markers, reusing the previous result if the frame has not changed
+        
+        Args:
+            session_id: Identifier of the streaming client session
+            image: OpenCV image (numpy array)
+            
+        Returns:
+            Dictionary containing detection results, plus "reused" and "frame_difference"
+        """
+        thumbnail = self._create_thumbnail(image)
+        image_shape = image.shape[:2]
+        
+        frame_difference = None
+        cached_result = None
+        now = time.monotonic()
+        with self._lock:
+            previous = self._sessions.get(session_id)
+            if previous is not None and previous["image_shape"] == image_shape:
+                self._sessions.move_to_end(session_id)
+                frame_difference = round(
+                    float(np.max(cv2.absdiff(thumbnail, previous["thumbnail"]))) / 255.0, 4
+                )
+                if (
+                    frame_difference < self.threshold
+                    and previous["reuse_count"] < self.max_reuse
+                    and now - previous["detected_at"] < self.max_reuse_seconds
+                ):
+                    previous["reuse_count"] += 1
+                    cached_result = previous["result"]
+        
+        if cached_result is not None:
+            logger.info(f"Session {session_id}: frame unchanged (diff={frame_difference}), reusing result")
+            return {
+                **cached_result,
+                "reused": True,
+                "frame_difference": frame_difference
+            }
+        
+        result = self.detector.detect_markers_from_image(image)
+        
+        with self._lock:
+            self._sessions[session_id] = {
+                "thumbnail": thumbnail,
+                "image_shape": image_shape,
+                "result": result,
+                "reuse_count": 0,
+                "detected_at": now
+            }
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        
+        return {
+            **result,
+            "reused": False,
+            "frame_difference": frame_difference
+        }
+    
+    def reset(self, session_id: str) -> bool:
+        """
+        Forget the cached frame and result for a session
+        
+        Args:
+            session_id: Identifier of the streaming client session
+            
+        Returns:
+            True if the session existed
+        """
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+    
+    def _thumbnail_scale(self, width: int, height: int) -> float:
+        """
+        Calculate the downscale factor for the comparison thumbnail
+        
+        The smallest marker the detector accepts has a perimeter of
+        minMarkerPerimeterRate * max(width, height), i.e. a side of a quarter of that,
+        split into markerSize + 2 * markerBorderBits bits.
+        
+        Args:
+            width: Frame width in pixels
+            height: Frame height in pixels
+            
+        Returns:
+            Scale factor between 0 and 1
+        """
+        parameters = self.detector.parameters
+        bits = self.detector.dictionary.markerSize + 2 * parameters.markerBorderBits
+        min_bit_size = parameters.minMarkerPerimeterRate * max(width, height) / 4 / bits
+        if min_bit_size <= 0:
+            return 1.0
+        return min(1.0, self.pixels_per_bit / min_bit_size)
+    
+    def _create_thumbnail(self, image: np.ndarray) -> np.ndarray:
+        """
+        Create a grayscale thumbnail used for frame comparison
+        
+        Args:
+            image: OpenCV image (numpy array)
+            
+        Returns:
+            Grayscale thumbnail keeping the frame's aspect ratio
+        """
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        height, width = gray.shape[:2]
+        scale = self._thumbnail_scale(width, height)
+        if scale >= 1.0:
+            return gray
+        return cv2.resize(
+            gray,
+            (max(1, round(width * scale)), max(1, round(height * scale))),
+            interpolation=cv2.INTER_AREA
+        )
+
+
 # Create global detector instance
 detector = MarkerDetector()
 
+# Create global frame difference gate for streaming clients
+frame_gate = FrameDifferenceGate(
+    detector,
+    threshold=float(os.getenv("FRAME_DIFF_THRESHOLD", "0.15")),
+    pixels_per_bit=float(os.getenv("FRAME_DIFF_PIXELS_PER_BIT", "1.0")),
+    max_sessions=int(os.getenv("FRAME_DIFF_MAX_SESSIONS", "256")),
+    max_reuse=int(os.getenv("FRAME_DIFF_MAX_REUSE", "30")),
+    max_reuse_seconds=float(os.getenv("FRAME_DIFF_MAX_REUSE_SECONDS", "1.0"))
+)
+
 
 def detect_markers(image_bytes: bytes) -> Dict[str, Any]:
     """
@@ -195,6 +393,21 @@ def detect_markers(image_bytes: bytes) -> Dict[str, Any]:
     return detector.detect_markers_from_bytes(image_bytes)
 
 
+def detect_markers_gated(image_bytes: bytes, session_id: str) -> Dict[str, Any]:
+    """
+    Detect markers for a streaming session, reusing the previous result for unchanged frames
+    
+    Args:
+        image_bytes: Image data as bytes
+        session_id: Identifier of the streaming client session
+        
+    Returns:
+        Dictionary containing detection results and whether they were reused
+    """
+    image = MarkerDetector.decode_image(image_bytes)
+    return frame_gate.detect_markers_from_image(session_id, image)
+
+
 def detect_markers_with_annotation(image_bytes: bytes) -> Tuple[Dict[str, Any], Optional[np.ndarray]]:
     """
     Detect markers and return both results and annotated image
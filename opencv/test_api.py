@@ -66,6 +66,179 @@ def test_marker_detection(image_path: str):
         return False
 
 
+def test_stream_detection(image_path: str, session_id: str = "test-session"):
+    """Test streaming detection endpoint (second identical frame should reuse the result)"""
+    if not os.path.exists(image_path):
+        print(f"❌ Test image not found: {image_path}")
+        return False
+    
+    try:
+        requests.delete(f"{API_BASE_URL}/detect-markers-stream/{session_id}")
+        
+        results = []
+        for _ in range(2):
+            with open(image_path, 'rb') as f:
+                files = {'file': ('test_image.png', f, 'image/png')}
+                data = {'session_id': session_id}
+                response = requests.post(f"{API_BASE_URL}/detect-markers-stream", files=files, data=data)
+            response.raise_for_status()
+            results.append(response.json())
+        
+        if results[0]['reused'] or not results[1]['reused']:
+            print(f"❌ Stream detection test failed: reused flags {[r['reused'] for r in results]}")
+            return False
+        
+        print("✅ Stream detection test passed")
+        print(f"Total markers found: {results[1].get('total_markers', 0)} (reused)")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Stream detection test failed: {e}")
+        return False
+
+
+def _make_card_frame(width: int = 1280, height: int = 720, card_size: int = 240):
+    """Place the 6-marker test card in a small area of a large white frame"""
+    import cv2
+    import numpy as np
+    
+    card = cv2.resize(cv2.imread("markers_0_to_5.png"), (card_size, card_size))
+    frame = np.full((height, width, 3), 255, dtype=np.uint8)
+    top, left = (height - card_size) // 2, (width - card_size) // 2
+    frame[top:top + card_size, left:left + card_size] = card
+    return frame, top, left
+
+
+def _make_marker_frame(marker_id: int, marker_size: int, width: int = 1280, height: int = 720):
+    """Place a single small marker in a large white frame"""
+    import cv2
+    import numpy as np
+    from cv2 import aruco
+    
+    dictionary = aruco.getPredefinedDictionary(aruco.DICT_4X4_50)
+    marker = cv2.cvtColor(aruco.generateImageMarker(dictionary, marker_id, marker_size), cv2.COLOR_GRAY2BGR)
+    frame = np.full((height, width, 3), 255, dtype=np.uint8)
+    top, left = (height - marker_size) // 2, (width - marker_size) // 2
+    frame[top:top + marker_size, left:left + marker_size] = marker
+    return frame
+
+
+def test_frame_gate_in_process():
+    """Test FrameDifferenceGate without a running server"""
+    from marker_detector import FrameDifferenceGate, detector
+    
+    import time
+    
+    gate = FrameDifferenceGate(detector, max_reuse=2, max_reuse_seconds=60)
+    frame, top, left = _make_card_frame()
+    
+    # Identical frame is reused
+    assert gate.detect_markers_from_image("s", frame)["reused"] is False
+    assert gate.detect_markers_from_image("s", frame.copy())["reused"] is True
+    
+    # Removing 3 markers in a small area forces re-detection
+    changed = frame.copy()
+    changed[top:top + 80, left:left + 240] = 255
+    result = gate.detect_markers_from_image("s", changed)
+    assert result["reused"] is False, result["frame_difference"]
+    assert result["total_markers"] == detector.detect_markers_from_image(changed)["total_markers"]
+    
+    # Swapping one small marker for another returns the new ID
+    for marker_size in (40, 12):
+        gate.reset("s")
+        assert gate.detect_markers_from_image("s", _make_marker_frame(2, marker_size))["reused"] is False
+        result = gate.detect_markers_from_image("s", _make_marker_frame(3, marker_size))
+        assert result["reused"] is False, (marker_size, result["frame_difference"])
+        assert [m["id"] for m in result["detected_markers"]] == [3], marker_size
+    
+    # Frame of a different size is not reused
+    smaller, _, _ = _make_card_frame(width=640, height=480)
+    assert gate.detect_markers_from_image("s", smaller)["reused"] is False
+    
+    # Reuse is limited to max_reuse consecutive frames
+    assert gate.detect_markers_from_image("s", smaller)["reused"] is True
+    assert gate.detect_markers_from_image("s", smaller)["reused"] is True
+    assert gate.detect_markers_from_image("s", smaller)["reused"] is False
+    
+    # reset clears the session
+    assert gate.reset("s") is True
+    assert gate.reset("s") is False
+    assert gate.detect_markers_from_image("s", smaller)["reused"] is False
+    
+    # Cached results expire after max_reuse_seconds
+    timed_gate = FrameDifferenceGate(detector, max_reuse_seconds=0.05)
+    assert timed_gate.detect_markers_from_image("s", smaller)["reused"] is False
+    assert timed_gate.detect_markers_from_image("s", smaller)["reused"] is True
+    time.sleep(0.1)
+    assert timed_gate.detect_markers_from_image("s", smaller)["reused"] is False
+    
+    print("✅ Frame gate in-process test passed")
+
+
+def test_load_generator_in_process():
+    """Test load_test report logic and an in-process run without a running server"""
+    import asyncio
+    from load_test import LoadGenerator, LoadTestConfig, RequestResult, parse_image_spec, percentile
+    from marker_detector import frame_gate
+    
+    # percentile
+    assert percentile([], 50) == 0.0
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0) == 1.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile([1.0, 2.0, 3.0, 4.0], 100) == 4.0
+    
+    # parse_image_spec
+    assert parse_image_spec("img.png") == ("img.png", 1.0)
+    assert parse_image_spec("img.png:3") == ("img.png", 3.0)
+    assert parse_image_spec("img.png:0.5") == ("img.png", 0.5)
+    assert parse_image_spec("C:\\images\\img.png") == ("C:\\images\\img.png", 1.0)
+    assert parse_image_spec("C:\\images\\img.png:2") == ("C:\\images\\img.png", 2.0)
+    for spec in ("img.png:0", "img.png:-1", "img.png:nan", "img.png:inf"):
+        try:
+            parse_image_spec(spec)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{spec} should be rejected")
+    
+    # summarize splits success, shed and error buckets
+    generator = LoadGenerator(LoadTestConfig(images=[]))
+    generator.results = [
+        RequestResult(0.010, 200, "a.png", reused=True),
+        RequestResult(0.020, 200, "a.png", reused=False),
+        RequestResult(0.030, 429, "a.png"),
+        RequestResult(0.040, 503, "a.png"),
+        RequestResult(0.050, 500, "a.png"),
+        RequestResult(0.060, None, "a.png", error="ConnectError"),
+    ]
+    report = generator.summarize(2.0)
+    assert report["total_requests"] == 6
+    assert report["throughput_rps"] == 1.0
+    assert report["shed_rate"] == round(2 / 6, 4)
+    assert report["error_rate"] == round(2 / 6, 4)
+    assert report["reuse_rate"] == 0.5
+    assert report["latency_ms"]["p50"] == 15.0
+    assert report["status_counts"] == {"200": 2, "429": 1, "503": 1, "500": 1, "exception": 1}
+    
+    # In-process run over httpx.ASGITransport: one session, identical frames
+    frame_gate.reset("loadtest-0")
+    config = LoadTestConfig(
+        endpoint="/detect-markers-stream",
+        concurrency=1,
+        total_requests=5,
+        images=[("markers_0_to_5.png", 1.0)],
+    )
+    report = asyncio.run(LoadGenerator(config).run())
+    assert report["total_requests"] == 5
+    assert report["status_counts"] == {"200": 5}
+    assert report["error_rate"] == 0.0
+    assert report["shed_rate"] == 0.0
+    assert report["reuse_rate"] == 0.8
+    
+    print("✅ Load generator in-process test passed")
+
+
 def test_annotated_detection(image_path: str, output_path: str = "annotated_result.png"):
     """Test annotated marker detection endpoint"""
     if not os.path.exists(image_path):
@@ -101,6 +274,18 @@ def main():
     """Run all tests"""
     print("🧪 Testing ArUco Marker Detection API\n")
     
+    # Test frame gate in-process (no server required)
+    try:
+        test_frame_gate_in_process()
+    except AssertionError as e:
+        print(f"❌ Frame gate in-process test failed: {e}")
+    print()
+    try:
+        test_load_generator_in_process()
+    except AssertionError as e:
+        print(f"❌ Load generator in-process test failed: {e}")
+    print()
+    
     # Test basic endpoints
     test_root_endpoint()
     print()
@@ -130,6 +315,8 @@ def main():
         print(f"🖼️  Testing with image: {image_path}")
         test_marker_detection(image_path)
         print()
+        test_stream_detection(image_path)
+        print()
         test_annotated_detection(image_path, f"annotated_{os.path.basename(image_path)}")
         print()
 